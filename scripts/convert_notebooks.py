@@ -15,58 +15,127 @@ Features:
 - Adds "Open in Colab" badges
 - Extracts title from first heading or filename
 - Handles images and outputs
+- Streams notebook cells with ijson when it is installed (pip install ijson),
+  otherwise parses with orjson if available
 """
 
+import io
 import json
+import os
 import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TextIO, Union
 import argparse
 
+try:
+    import ijson
+except ImportError:  # optional; fall back to loading the whole notebook
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional; faster parser for the full-document fallback
+    orjson = None
+
+
+# Relative image links in markdown cells, rewritten to the site's /images/ root
+_IMG_RE = re.compile(r'!\[(.*?)\]\(((?!http)[^)]+)\)')
+
+
+def _iter_files(root: Union[str, os.PathLike], suffix: str) -> Iterator[str]:
+    """Recursively yield paths of files ending with suffix, skipping cache dirs."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in ('__pycache__', '.ipynb_checkpoints'):
+                    continue
+                yield from _iter_files(entry.path, suffix)
+            elif entry.name.endswith(suffix):
+                yield entry.path
+
 
 class NotebookConverter:
     """Convert Jupyter notebooks to MDX format."""
     
-    def __init__(self, trace_repo_url: str = "https://github.com/AgentOpt/OpenTrace"):
+    def __init__(
+        self,
+        trace_repo_url: str = "https://github.com/AgentOpt/OpenTrace",
+        docs_dir: Optional[Path] = None
+    ):
         self.trace_repo_url = trace_repo_url
+        # Saved paths are reported relative to this directory
+        self.docs_dir = docs_dir if docs_dir is not None else Path.cwd()
     
-    def extract_title(self, cells: List[Dict[str, Any]]) -> str:
-        """Extract title from first markdown heading or use filename."""
-        for cell in cells:
-            if cell.get('cell_type') == 'markdown':
-                for line in cell.get('source', []):
-                    if line.startswith('# '):
-                        return line[2:].strip()
-        return "Untitled Notebook"
+    def iter_cells(self, notebook_path: Path, show_outputs: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield notebook cells, dropping outputs when they won't be rendered."""
+        if ijson is None:
+            if orjson is not None:
+                with open(notebook_path, 'rb') as f:
+                    notebook = orjson.loads(f.read())
+            else:
+                with open(notebook_path, 'r', encoding='utf-8') as f:
+                    notebook = json.load(f)
+            yield from notebook.get('cells', [])
+            return
+        
+        with open(notebook_path, 'rb') as f:
+            if show_outputs:
+                yield from ijson.items(f, 'cells.item')
+                return
+            
+            # Build each cell from parse events, skipping everything under
+            # 'outputs' so embedded images are never assembled into the cell
+            builder = None
+            for prefix, event, value in ijson.parse(f):
+                if builder is None:
+                    if prefix == 'cells.item' and event == 'start_map':
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    continue
+                
+                if prefix == 'cells.item.outputs' or prefix.startswith('cells.item.outputs.'):
+                    continue
+                if prefix == 'cells.item' and event == 'map_key' and value == 'outputs':
+                    continue
+                
+                builder.event(event, value)
+                if prefix == 'cells.item' and event == 'end_map':
+                    yield builder.value
+                    builder = None
+    
+    @staticmethod
+    def _source_text(cell: Dict[str, Any]) -> str:
+        """Return a cell's source as one string (nbformat allows a list of lines or a string)."""
+        source = cell.get('source', '')
+        # Parsed JSON never yields list subclasses, so an exact type check suffices
+        return ''.join(source) if type(source) is list else source
+    
+    def extract_title(self, cell: Dict[str, Any]) -> Optional[str]:
+        """Extract the first level-one heading from a markdown cell, if any."""
+        source = cell.get('source', [])
+        # Check the stored lines directly rather than joining the cell
+        lines = source if type(source) is list else source.splitlines()
+        for line in lines:
+            if line.startswith('# '):
+                return line[2:].strip()
+        return None
     
     def convert_markdown_cell(self, cell: Dict[str, Any]) -> str:
         """Convert a markdown cell to MDX."""
-        source = cell.get('source', [])
-        if isinstance(source, list):
-            content = ''.join(source)
-        else:
-            content = source
+        content = self._source_text(cell)
         
         # Handle image paths (convert relative paths)
-        content = re.sub(
-            r'!\[(.*?)\]\(((?!http)[^\)]+)\)',
-            r'![\1](/images/\2)',
-            content
-        )
+        content = _IMG_RE.sub(r'![\1](/images/\2)', content)
         
         return content
     
     def convert_code_cell(self, cell: Dict[str, Any], show_output: bool = True) -> str:
         """Convert a code cell to MDX code block."""
-        source = cell.get('source', [])
-        if isinstance(source, list):
-            code = ''.join(source)
-        else:
-            code = source
-        
         # Remove trailing newlines
-        code = code.rstrip('\n')
+        code = self._source_text(cell).rstrip('\n')
         
         lines = [
             "```python",
@@ -98,19 +167,18 @@ class NotebookConverter:
         for output in outputs:
             if output.get('output_type') == 'stream':
                 text = output.get('text', [])
+                # Join multi-line text once per output rather than per line
                 if isinstance(text, list):
-                    output_lines.extend(text)
-                else:
-                    output_lines.append(text)
+                    text = ''.join(text)
+                output_lines.append(text)
             
             elif output.get('output_type') in ['execute_result', 'display_data']:
                 data = output.get('data', {})
                 if 'text/plain' in data:
                     text = data['text/plain']
                     if isinstance(text, list):
-                        output_lines.extend(text)
-                    else:
-                        output_lines.append(text)
+                        text = ''.join(text)
+                    output_lines.append(text)
             
             elif output.get('output_type') == 'error':
                 # Include error information
@@ -126,99 +194,134 @@ class NotebookConverter:
         colab_path: Optional[str] = None
     ) -> str:
         """Generate MDX frontmatter."""
-        lines = ["---", f"title: {title}"]
+        buf = io.StringIO()
+        buf.write("---\n")
+        buf.write(f"title: {title}\n")
         
         if description:
-            lines.append(f"description: {description}")
+            buf.write(f"description: {description}\n")
         else:
-            lines.append(f"description: Tutorial notebook - {title}")
+            buf.write(f"description: Tutorial notebook - {title}\n")
         
-        lines.append("---")
-        lines.append("")
+        buf.write("---\n")
+        buf.write("\n")
         
         # Add note about editing
-        lines.extend([
-            "{/* This file was auto-generated from a Jupyter notebook. */}",
-            "{/* You can edit it, but changes may be overwritten if the notebook is regenerated. */}",
-            ""
-        ])
+        buf.write("{/* This file was auto-generated from a Jupyter notebook. */}\n")
+        buf.write("{/* You can edit it, but changes may be overwritten if the notebook is regenerated. */}\n")
         
         # Add Colab badge if path provided
         if colab_path:
-            lines.extend([
-                "<Callout type=\"tip\">",
-                f"  [![Open In Colab](https://colab.research.google.com/assets/colab-badge.svg)]({colab_path})",
-                "</Callout>",
-                ""
-            ])
+            buf.write("\n")
+            buf.write("<Callout type=\"tip\">\n")
+            buf.write(f"  [![Open In Colab](https://colab.research.google.com/assets/colab-badge.svg)]({colab_path})\n")
+            buf.write("</Callout>\n")
         
-        return '\n'.join(lines)
+        return buf.getvalue()
     
-    def convert_notebook(
-        self, 
-        notebook_path: Path, 
-        output_path: Path,
-        relative_notebook_path: Optional[str] = None,
+    def write_mdx(
+        self,
+        f: TextIO,
+        cells: Iterable[Dict[str, Any]],
+        colab_path: Optional[str] = None,
         show_outputs: bool = False
     ) -> None:
-        """Convert a Jupyter notebook to MDX format."""
-        print(f"📓 Converting: {notebook_path.name}")
-        
-        # Read notebook
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            notebook = json.load(f)
-        
-        cells = notebook.get('cells', [])
-        
-        # Extract title
-        title = self.extract_title(cells)
+        """Write MDX for a stream of notebook cells to an open text file."""
+        # The title comes from the first markdown heading and goes into the
+        # frontmatter, so cells are held back only until it has been seen
+        title = None
+        pending = io.StringIO()
+        out = pending
         
-        # Generate Colab link
-        colab_path = None
-        if relative_notebook_path:
-            colab_path = f"https://colab.research.google.com/github/AgentOpt/Trace/blob/main/{relative_notebook_path}"
-        
-        # Generate MDX content
-        mdx_lines = []
-        
-        # Add frontmatter
-        frontmatter = self.generate_frontmatter(title, colab_path=colab_path)
-        mdx_lines.append(frontmatter)
-        
-        # Convert cells
         for i, cell in enumerate(cells):
             cell_type = cell.get('cell_type')
             
             if cell_type == 'markdown':
+                if title is None:
+                    title = self.extract_title(cell)
+                    if title is not None:
+                        f.write(self.generate_frontmatter(title, colab_path=colab_path))
+                        f.write(pending.getvalue())
+                        out = f
+                
                 content = self.convert_markdown_cell(cell)
                 # Skip the first h1 if it matches the title (already in frontmatter)
-                if i == 0 and content.strip().startswith(f"# {title}"):
+                if i == 0 and title is not None and content.strip().startswith(f"# {title}"):
                     continue
-                mdx_lines.append(content)
-                mdx_lines.append("")
+                out.write("\n")
+                out.write(content)
+                out.write("\n")
             
             elif cell_type == 'code':
                 # Skip empty code cells
                 source = cell.get('source', [])
-                if not source or (isinstance(source, list) and not ''.join(source).strip()):
+                if not source:
+                    continue
+                if isinstance(source, list):
+                    if not any(line.strip() for line in source):
+                        continue
+                elif not source.strip():
                     continue
                 
-                code_block = self.convert_code_cell(cell, show_output=show_outputs)
-                mdx_lines.append(code_block)
-                mdx_lines.append("")
+                out.write("\n")
+                out.write(self.convert_code_cell(cell, show_output=show_outputs))
+                out.write("\n")
+        
+        if title is None:
+            f.write(self.generate_frontmatter("Untitled Notebook", colab_path=colab_path))
+            f.write(pending.getvalue())
+    
+    def convert_notebook(
+        self, 
+        notebook_path: Path, 
+        output_path: Path,
+        relative_notebook_path: Optional[str] = None,
+        show_outputs: bool = False
+    ) -> None:
+        """Convert a Jupyter notebook to MDX format."""
+        print(f"📓 Converting: {notebook_path.name}")
         
-        # Write MDX file
+        # Generate Colab link
+        colab_path = None
+        if relative_notebook_path:
+            colab_path = f"https://colab.research.google.com/github/AgentOpt/Trace/blob/main/{relative_notebook_path}"
+        
+        # Stream cells straight to a uniquely named temporary file so a failed
+        # or concurrent conversion never leaves a truncated page behind
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(mdx_lines))
         
-        print(f"   ✅ Saved to: {output_path.relative_to(output_path.parent.parent.parent)}")
+        # Output blobs are dropped while streaming
+        cells = self.iter_cells(notebook_path, show_outputs=show_outputs)
+        with tempfile.NamedTemporaryFile(
+            'w', dir=output_path.parent, suffix='.tmp', delete=False, encoding='utf-8'
+        ) as f:
+            tmp_path = Path(f.name)
+            try:
+                self.write_mdx(f, cells, colab_path=colab_path, show_outputs=show_outputs)
+            except BaseException:
+                f.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        
+        try:
+            # Temporary files are created owner-only; give the page the mode
+            # a plain open() would have, honouring the current umask
+            mask = os.umask(0)
+            os.umask(mask)
+            os.chmod(tmp_path, 0o666 & ~mask)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        print(f"   ✅ Saved to: {os.path.relpath(output_path, self.docs_dir)}")
     
     def convert_all_notebooks(self, examples_dir: Path, output_base: Path) -> None:
         """Convert all notebooks in the examples directory."""
         print("🚀 Converting all notebooks in examples directory...")
         
-        notebook_files = list(examples_dir.rglob("*.ipynb"))
+        # Sorted so the choice between notebooks sharing an output page is stable
+        notebook_files = sorted(Path(p) for p in _iter_files(examples_dir, '.ipynb'))
         
         if not notebook_files:
             print("⚠️  No notebook files found")
@@ -226,11 +329,10 @@ class NotebookConverter:
         
         print(f"📚 Found {len(notebook_files)} notebooks")
         
+        # Map each output page to exactly one notebook before converting, since
+        # parallel conversions of the same page would overwrite each other
+        tasks = {}
         for notebook_path in notebook_files:
-            # Skip checkpoints
-            if '.ipynb_checkpoints' in str(notebook_path):
-                continue
-            
             # Get relative path from examples dir
             relative_path = notebook_path.relative_to(examples_dir.parent)
             
@@ -245,15 +347,29 @@ class NotebookConverter:
             
             output_path = output_base / category / notebook_path.with_suffix('.mdx').name
             
-            try:
-                self.convert_notebook(
+            if output_path in tasks:
+                print(f"⚠️  Skipping {relative_path}: {output_path.name} is already generated from {tasks[output_path][1]}")
+                continue
+            tasks[output_path] = (notebook_path, relative_path)
+        
+        # Notebooks are independent, so convert them across worker processes
+        with ProcessPoolExecutor() as executor:
+            futures = {}
+            for output_path, (notebook_path, relative_path) in tasks.items():
+                future = executor.submit(
+                    self.convert_notebook,
                     notebook_path, 
                     output_path,
                     relative_notebook_path=str(relative_path),
                     show_outputs=False  # Can be customized
                 )
-            except Exception as e:
-                print(f"   ❌ Error converting {notebook_path.name}: {e}")
+                futures[future] = notebook_path
+            
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"   ❌ Error converting {futures[future].name}: {e}")
 
 
 def main():
@@ -284,13 +400,13 @@ def main():
     
     args = parser.parse_args()
     
-    converter = NotebookConverter()
-    
     # Get paths
     script_dir = Path(__file__).parent
     docs_dir = script_dir.parent
     trace_repo = docs_dir.parent / 'Trace'
     
+    converter = NotebookConverter(docs_dir=docs_dir)
+    
     if args.all:
         # Convert all notebooks
         examples_dir = trace_repo / 'examples'
@@ -10,11 +10,41 @@ This will scan the opto package and generate API reference documentation.
 """
 
 import ast
+import functools
+import hashlib
+import io
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
-import importlib.util
+from typing import Iterator, List, Dict, Any, Optional, Union
+
+
+# Docstring section headers rendered as bold headings
+_DOCSTRING_SECTIONS = frozenset({
+    'Args:', 'Arguments:', 'Parameters:', 'Returns:', 'Raises:',
+    'Examples:', 'Example:', 'Note:', 'Notes:',
+})
+
+
+# Directories that never contain documented modules
+_SKIP_DIRS = frozenset({'__pycache__', '.ipynb_checkpoints', 'test', 'tests'})
+
+# Test and pytest support modules that don't follow the test_*/*_test naming
+_SKIP_FILES = frozenset({'conftest.py', 'test.py', 'tests.py'})
+
+
+def _iter_files(root: Union[str, os.PathLike], suffix: str) -> Iterator[str]:
+    """Recursively yield paths of files ending with suffix, pruning skipped dirs."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in _SKIP_DIRS:
+                    continue
+                yield from _iter_files(entry.path, suffix)
+            elif entry.name.endswith(suffix):
+                yield entry.path
 
 
 class APIDocGenerator:
@@ -24,67 +54,91 @@ class APIDocGenerator:
         self.source_dir = source_dir
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_file = self.output_dir / '.doc_cache.json'
+    
+    def load_cache(self, generator_digest: str) -> Dict[str, str]:
+        """Load source hashes from the previous run, if it used this generator."""
+        try:
+            cache = json.loads(self.cache_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        
+        # Any change to the generator itself invalidates every page
+        if not isinstance(cache, dict) or cache.get('generator') != generator_digest:
+            return {}
+        return cache.get('files', {})
+    
+    def save_cache(self, generator_digest: str, files: Dict[str, str]) -> None:
+        """Record source hashes of the modules written in this run."""
+        cache = {'generator': generator_digest, 'files': files}
+        self.cache_file.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding='utf-8')
     
     def get_python_files(self, package_path: Path) -> List[Path]:
         """Recursively get all Python files in a package."""
         python_files = []
-        for file in package_path.rglob("*.py"):
-            # Skip __pycache__, tests, and private modules
-            if "__pycache__" in str(file) or "test" in str(file).lower():
+        for file in _iter_files(package_path, '.py'):
+            # Skip test modules (cache and test dirs are pruned during the walk)
+            name = os.path.basename(file)
+            if name in _SKIP_FILES or name.startswith('test_') or name.endswith('_test.py'):
                 continue
-            python_files.append(file)
+            python_files.append(Path(file))
         return python_files
     
     def parse_module(self, file_path: Path) -> Dict[str, Any]:
         """Parse a Python module and extract classes, functions, and docstrings."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            try:
-                tree = ast.parse(f.read())
-            except SyntaxError as e:
-                print(f"⚠️  Syntax error in {file_path}: {e}")
-                return {}
+        # ast.parse accepts bytes and honours the source encoding itself
+        with open(file_path, 'rb') as f:
+            source = f.read()
+        
+        try:
+            tree = ast.parse(source, filename=str(file_path))
+        except SyntaxError as e:
+            print(f"⚠️  Syntax error in {file_path}: {e}")
+            return {}
         
-        module_info = {
+        # Members are produced lazily and consumed once by generate_module_mdx
+        return {
             'docstring': ast.get_docstring(tree),
-            'classes': [],
-            'functions': [],
+            'classes': self.iter_classes(tree),
+            'functions': self.iter_functions(tree),
             'path': file_path
         }
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                class_info = {
+    
+    def iter_classes(self, tree: ast.Module) -> Iterator[Dict[str, Any]]:
+        """Yield public top-level classes of a parsed module."""
+        # Only top-level definitions are documented, so skip walking function bodies
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and not node.name.startswith('_'):
+                yield {
                     'name': node.name,
                     'docstring': ast.get_docstring(node),
-                    'methods': [],
-                    'is_private': node.name.startswith('_')
+                    'methods': self.iter_methods(node),
+                }
+    
+    def iter_methods(self, node: ast.ClassDef) -> Iterator[Dict[str, Any]]:
+        """Yield public methods defined directly in a class body."""
+        for item in node.body:
+            # Skip private and magic methods for now
+            if isinstance(item, ast.FunctionDef) and not item.name.startswith('_'):
+                yield {
+                    'name': item.name,
+                    'docstring': ast.get_docstring(item),
+                    'args': [arg.arg for arg in item.args.args],
                 }
-                
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        if not item.name.startswith('__'):  # Skip magic methods for now
-                            class_info['methods'].append({
-                                'name': item.name,
-                                'docstring': ast.get_docstring(item),
-                                'args': [arg.arg for arg in item.args.args],
-                                'is_private': item.name.startswith('_')
-                            })
-                
-                if not class_info['is_private']:
-                    module_info['classes'].append(class_info)
-            
-            elif isinstance(node, ast.FunctionDef) and not isinstance(node, ast.AsyncFunctionDef):
-                # Only top-level functions
-                if node.col_offset == 0 and not node.name.startswith('_'):
-                    module_info['functions'].append({
-                        'name': node.name,
-                        'docstring': ast.get_docstring(node),
-                        'args': [arg.arg for arg in node.args.args],
-                    })
-        
-        return module_info
     
-    def format_docstring(self, docstring: str) -> str:
+    def iter_functions(self, tree: ast.Module) -> Iterator[Dict[str, Any]]:
+        """Yield public top-level functions of a parsed module."""
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and not node.name.startswith('_'):
+                yield {
+                    'name': node.name,
+                    'docstring': ast.get_docstring(node),
+                    'args': [arg.arg for arg in node.args.args],
+                }
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def format_docstring(docstring: str) -> str:
         """Format docstring for MDX output."""
         if not docstring:
             return "*No documentation available.*"
@@ -96,84 +150,81 @@ class APIDocGenerator:
         for line in lines:
             stripped = line.strip()
             # Convert common docstring sections to headers
-            if stripped in ['Args:', 'Arguments:', 'Parameters:', 'Returns:', 'Raises:', 'Examples:', 'Example:', 'Note:', 'Notes:']:
+            if stripped in _DOCSTRING_SECTIONS:
                 formatted_lines.append(f'\n**{stripped}**\n')
             else:
                 formatted_lines.append(line)
         
         return '\n'.join(formatted_lines)
     
-    def generate_module_mdx(self, module_info: Dict[str, Any], relative_path: str) -> str:
-        """Generate MDX content for a module."""
+    def generate_module_mdx(self, module_info: Dict[str, Any], relative_path: str) -> Optional[str]:
+        """Generate MDX content for a module, or None if it has no public members."""
         file_path = module_info['path']
         module_name = relative_path.replace('/', '.').replace('.py', '')
         
-        lines = [
-            "---",
-            f"title: {module_name}",
-            f"description: API reference for {module_name}",
-            "---",
-            "",
-            f"# {module_name}",
-            ""
-        ]
+        buf = io.StringIO()
+        buf.write("---\n")
+        buf.write(f"title: {module_name}\n")
+        buf.write(f"description: API reference for {module_name}\n")
+        buf.write("---\n\n")
+        buf.write(f"# {module_name}\n\n")
         
         # Module docstring
         if module_info['docstring']:
-            lines.append(self.format_docstring(module_info['docstring']))
-            lines.append("")
+            buf.write(self.format_docstring(module_info['docstring']))
+            buf.write("\n\n")
+        
+        # Section headers are written on the first member, since members arrive lazily
+        has_members = False
         
         # Classes
-        if module_info['classes']:
-            lines.append("## Classes")
-            lines.append("")
+        for i, cls in enumerate(module_info['classes']):
+            if i == 0:
+                buf.write("## Classes\n\n")
+            has_members = True
+            
+            buf.write(f"### `{cls['name']}`\n\n")
+            
+            if cls['docstring']:
+                buf.write(self.format_docstring(cls['docstring']))
+            else:
+                buf.write("*No documentation available.*")
+            buf.write("\n\n")
             
-            for cls in module_info['classes']:
-                lines.append(f"### `{cls['name']}`")
-                lines.append("")
+            # Methods
+            for j, method in enumerate(cls['methods']):
+                if j == 0:
+                    buf.write("#### Methods\n\n")
                 
-                if cls['docstring']:
-                    lines.append(self.format_docstring(cls['docstring']))
-                else:
-                    lines.append("*No documentation available.*")
-                lines.append("")
+                args_str = ', '.join(method['args'])
+                buf.write(f"##### `{method['name']}({args_str})`\n\n")
                 
-                # Methods
-                if cls['methods']:
-                    lines.append("#### Methods")
-                    lines.append("")
-                    
-                    for method in cls['methods']:
-                        if method['is_private']:
-                            continue
-                        
-                        args_str = ', '.join(method['args'])
-                        lines.append(f"##### `{method['name']}({args_str})`")
-                        lines.append("")
-                        
-                        if method['docstring']:
-                            lines.append(self.format_docstring(method['docstring']))
-                        else:
-                            lines.append("*No documentation available.*")
-                        lines.append("")
+                if method['docstring']:
+                    buf.write(self.format_docstring(method['docstring']))
+                else:
+                    buf.write("*No documentation available.*")
+                buf.write("\n\n")
         
         # Functions
-        if module_info['functions']:
-            lines.append("## Functions")
-            lines.append("")
+        for i, func in enumerate(module_info['functions']):
+            if i == 0:
+                buf.write("## Functions\n\n")
+            has_members = True
             
-            for func in module_info['functions']:
-                args_str = ', '.join(func['args'])
-                lines.append(f"### `{func['name']}({args_str})`")
-                lines.append("")
-                
-                if func['docstring']:
-                    lines.append(self.format_docstring(func['docstring']))
-                else:
-                    lines.append("*No documentation available.*")
-                lines.append("")
+            args_str = ', '.join(func['args'])
+            buf.write(f"### `{func['name']}({args_str})`\n\n")
+            
+            if func['docstring']:
+                buf.write(self.format_docstring(func['docstring']))
+            else:
+                buf.write("*No documentation available.*")
+            buf.write("\n\n")
         
-        return '\n'.join(lines)
+        if not has_members:
+            return None  # Nothing to document
+        
+        # Every block ends with a blank separator line; drop the final one
+        return buf.getvalue()[:-1]
     
     def generate_index_mdx(self, modules: List[str], category: str) -> str:
         """Generate an index page for a category."""
@@ -197,6 +248,29 @@ class APIDocGenerator:
         
         return '\n'.join(lines)
     
+    def generate_module_doc(self, py_file: Path, package_path: Path, package_output_dir: Path) -> Optional[Path]:
+        """Write the MDX page for one module, returning its path relative to the package."""
+        # Parse the module
+        module_info = self.parse_module(py_file)
+        if not module_info:
+            return None  # Unparseable module
+        
+        # Get relative path
+        relative_path = py_file.relative_to(package_path)
+        
+        # Generate MDX content
+        mdx_content = self.generate_module_mdx(module_info, str(relative_path))
+        if mdx_content is None:
+            return None  # Skip empty modules
+        
+        # Write to output
+        output_file = package_output_dir / relative_path.with_suffix('.mdx')
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        output_file.write_text(mdx_content, encoding='utf-8')
+        
+        return relative_path
+    
     def generate_docs(self):
         """Main function to generate all documentation."""
         print("🚀 Starting API documentation generation...")
@@ -211,57 +285,76 @@ class APIDocGenerator:
             'utils': self.source_dir / 'utils',
         }
         
-        for package_name, package_path in packages.items():
-            if not package_path.exists():
-                print(f"⚠️  Package {package_name} not found at {package_path}")
-                continue
-            
-            print(f"\n📦 Processing package: {package_name}")
-            
-            # Create output directory for this package
-            package_output_dir = self.output_dir / package_name
-            package_output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Get all Python files
-            python_files = self.get_python_files(package_path)
-            print(f"   Found {len(python_files)} Python files")
-            
-            generated_modules = []
-            
-            for py_file in python_files:
-                # Skip __init__.py for now (can be handled separately)
-                if py_file.name == '__init__.py':
+        # Source hashes from the last run let unchanged modules be skipped
+        generator_digest = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+        cache = self.load_cache(generator_digest)
+        new_cache = {}
+        
+        # Modules are independent, so parse and render them across worker processes
+        with ProcessPoolExecutor() as executor:
+            for package_name, package_path in packages.items():
+                if not package_path.exists():
+                    print(f"⚠️  Package {package_name} not found at {package_path}")
                     continue
                 
-                # Parse the module
-                module_info = self.parse_module(py_file)
+                print(f"\n📦 Processing package: {package_name}")
                 
-                if not module_info.get('classes') and not module_info.get('functions'):
-                    continue  # Skip empty modules
+                # Create output directory for this package
+                package_output_dir = self.output_dir / package_name
+                package_output_dir.mkdir(parents=True, exist_ok=True)
                 
-                # Get relative path
-                relative_path = py_file.relative_to(package_path)
+                # Get all Python files
+                python_files = self.get_python_files(package_path)
+                print(f"   Found {len(python_files)} Python files")
                 
-                # Generate MDX content
-                mdx_content = self.generate_module_mdx(module_info, str(relative_path))
+                futures = {}
+                digests = {}
+                results = {}
+                for index, py_file in enumerate(python_files):
+                    # Skip __init__.py for now (can be handled separately)
+                    if py_file.name == '__init__.py':
+                        continue
+                    
+                    # Reuse the existing page if the source is unchanged since the last run
+                    digest = hashlib.blake2b(py_file.read_bytes(), digest_size=16).hexdigest()
+                    relative_path = py_file.relative_to(package_path)
+                    output_file = package_output_dir / relative_path.with_suffix('.mdx')
+                    if cache.get(str(py_file)) == digest and output_file.exists():
+                        results[index] = relative_path
+                        new_cache[str(py_file)] = digest
+                        print(f"   ⏭️  {relative_path} (unchanged)")
+                        continue
+                    
+                    future = executor.submit(self.generate_module_doc, py_file, package_path, package_output_dir)
+                    futures[future] = index
+                    digests[index] = digest
                 
-                # Write to output
-                output_file = package_output_dir / relative_path.with_suffix('.mdx')
-                output_file.parent.mkdir(parents=True, exist_ok=True)
+                # Collect results as they finish, but keep the index in discovery order
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        relative_path = future.result()
+                    except Exception as e:
+                        # Leave the module out of the cache so it is retried next run
+                        print(f"   ❌ Error generating {python_files[index]}: {e}")
+                        continue
+                    if relative_path is not None:
+                        results[index] = relative_path
+                        new_cache[str(python_files[index])] = digests[index]
+                        print(f"   ✅ {relative_path}")
                 
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(mdx_content)
+                generated_modules = [
+                    str(results[index].with_suffix('.mdx')) for index in sorted(results)
+                ]
                 
-                generated_modules.append(str(relative_path.with_suffix('.mdx')))
-                print(f"   ✅ {relative_path}")
-            
-            # Generate index page for this package
-            if generated_modules:
-                index_content = self.generate_index_mdx(generated_modules, package_name)
-                index_file = package_output_dir / 'index.mdx'
-                with open(index_file, 'w', encoding='utf-8') as f:
-                    f.write(index_content)
-                print(f"   ✅ Created index.mdx")
+                # Generate index page for this package
+                if generated_modules:
+                    index_content = self.generate_index_mdx(generated_modules, package_name)
+                    index_file = package_output_dir / 'index.mdx'
+                    index_file.write_text(index_content, encoding='utf-8')
+                    print(f"   ✅ Created index.mdx")
+        
+        self.save_cache(generator_digest, new_cache)
         
         print("\n✨ API documentation generation complete!")
 